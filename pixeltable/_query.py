@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import builtins
-import copy
 import dataclasses
 import hashlib
 import json
 import logging
+import os
+import shutil
 import traceback
+import weakref
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Hashable, Iterator, NoReturn, Sequence, TypeVar
 
@@ -27,22 +29,30 @@ if TYPE_CHECKING:
     import torch
     import torch.utils.data
 
+    from pixeltable.utils.pytorch import PixeltablePytorchDataset
+
 __all__ = ['Query']
 
 _logger = logging.getLogger('pixeltable')
 
+# datasets returned by to_pytorch_dataset() that are still alive; they read their cache entry lazily, which therefore
+# must not be evicted
+_live_pytorch_datasets: weakref.WeakSet[PixeltablePytorchDataset] = weakref.WeakSet()
+
 
 class ResultSet:
     _rows: list[list[Any]]
+    _columns: dict[int, list[Any]]  # column idx -> column values; filled on demand
     _col_names: list[str]
+    _col_idxs: dict[str, int]
     __schema: dict[str, ColumnType]
-    __formatter: Formatter
 
     def __init__(self, rows: list[list[Any]], schema: dict[str, ColumnType]):
         self._rows = rows
+        self._columns = {}
         self._col_names = list(schema.keys())
+        self._col_idxs = {name: i for i, name in enumerate(self._col_names)}
         self.__schema = schema
-        self.__formatter = Formatter(len(self._rows), len(self._col_names), Env.get().http_address)
 
     @property
     def schema(self) -> dict[str, ColumnType]:
@@ -55,9 +65,11 @@ class ResultSet:
         return self.to_pandas().__repr__()
 
     def _repr_html_(self) -> str:
+        # the Formatter is only needed for html rendering, so we construct it here rather than in __init__()
+        result_formatter = Formatter(len(self._rows), len(self._col_names), Env.get().http_address)
         formatters: dict[Hashable, Callable[[object], str]] = {}
         for col_name, col_type in self.schema.items():
-            formatter = self.__formatter.get_pandas_formatter(col_type)
+            formatter = result_formatter.get_pandas_formatter(col_type)
             if formatter is not None:
                 formatters[col_name] = formatter
         return self.to_pandas().to_html(formatters=formatters, escape=False, index=False)
@@ -68,6 +80,18 @@ class ResultSet:
     def _reverse(self) -> None:
         """Reverse order of rows"""
         self._rows.reverse()
+        self._columns.clear()
+
+    def _get_column(self, col_idx: int) -> list[Any]:
+        """Returns the values of the given column, extracting them from the rows only once.
+
+        The returned list is shared by all accesses to the column and must not be modified.
+        """
+        col = self._columns.get(col_idx)
+        if col is None:
+            col = [row[col_idx] for row in self._rows]
+            self._columns[col_idx] = col
+        return col
 
     def to_pandas(self) -> pd.DataFrame:
         return pd.DataFrame.from_records(self._rows, columns=self._col_names)
@@ -111,27 +135,32 @@ class ResultSet:
                 raise excs.Error(str(e)) from e
 
     def _row_to_dict(self, row_idx: int) -> dict[str, Any]:
-        return {self._col_names[i]: self._rows[row_idx][i] for i in range(len(self._col_names))}
+        return dict(zip(self._col_names, self._rows[row_idx]))
 
     def __getitem__(self, index: Any) -> Any:
         if isinstance(index, str):
-            if index not in self._col_names:
+            col_idx = self._col_idxs.get(index)
+            if col_idx is None:
                 raise excs.Error(f'Invalid column name: {index}')
-            col_idx = self._col_names.index(index)
-            return [row[col_idx] for row in self._rows]
+            # this is the cached column, not a copy: callers must not modify the returned list
+            return self._get_column(col_idx)
         if isinstance(index, int):
             return self._row_to_dict(index)
         if isinstance(index, tuple) and len(index) == 2:
-            if not isinstance(index[0], int) or not isinstance(index[1], (str, int)):
+            row_idx, col = index
+            if not isinstance(row_idx, int) or not isinstance(col, (str, int)):
                 raise excs.Error(f'Bad index, expected [<row idx>, <column name | column index>]: {index}')
-            if isinstance(index[1], str) and index[1] not in self._col_names:
-                raise excs.Error(f'Invalid column name: {index[1]}')
-            col_idx = self._col_names.index(index[1]) if isinstance(index[1], str) else index[1]
-            return self._rows[index[0]][col_idx]
+            if isinstance(col, str):
+                col_idx = self._col_idxs.get(col)
+                if col_idx is None:
+                    raise excs.Error(f'Invalid column name: {col}')
+            else:
+                col_idx = col
+            return self._rows[row_idx][col_idx]
         raise excs.Error(f'Bad index: {index}')
 
     def __iter__(self) -> Iterator[dict[str, Any]]:
-        return (self._row_to_dict(i) for i in range(len(self)))
+        return (dict(zip(self._col_names, row)) for row in self._rows)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ResultSet):
@@ -187,6 +216,8 @@ class Query:
     order_by_clause: list[tuple[exprs.Expr, bool]] | None
     limit_val: exprs.Expr | None
     sample_clause: SampleClause | None
+    _vars_cache: dict[str, exprs.Variable] | None  # computed on demand by _vars()
+    _summary_hash: hashlib._Hash | None  # hash of as_dict(); computed on demand by _hash_result_set()
 
     def __init__(
         self,
@@ -202,7 +233,8 @@ class Query:
         self._from_clause = from_clause
 
         # exprs contain execution state and therefore cannot be shared
-        select_list = copy.deepcopy(select_list)
+        if select_list is not None:
+            select_list = [(expr.copy(), name) for expr, name in select_list]
         select_list_exprs, column_names = Query._normalize_select_list(self._from_clause.tbls, select_list)
         # check select list after expansion to catch early
         # the following two lists are always non empty, even if select list is None.
@@ -211,13 +243,17 @@ class Query:
         self._schema = {column_names[i]: select_list_exprs[i].col_type for i in range(len(column_names))}
         self.select_list = select_list
 
-        self.where_clause = copy.deepcopy(where_clause)
+        self.where_clause = where_clause.copy() if where_clause is not None else None
         assert group_by_clause is None or grouping_tbl is None
-        self.group_by_clause = copy.deepcopy(group_by_clause)
+        self.group_by_clause = exprs.Expr.copy_list(group_by_clause)
         self.grouping_tbl = grouping_tbl
-        self.order_by_clause = copy.deepcopy(order_by_clause)
+        self.order_by_clause = (
+            [(expr.copy(), asc) for expr, asc in order_by_clause] if order_by_clause is not None else None
+        )
         self.limit_val = limit
         self.sample_clause = sample_clause
+        self._vars_cache = None
+        self._summary_hash = None
 
     @classmethod
     def _normalize_select_list(
@@ -234,6 +270,8 @@ class Query:
         out_exprs: list[exprs.Expr] = []
         out_names: list[str] = []  # keep track of order
         seen_out_names: set[str] = set()  # use to check for duplicates in loop, avoid square complexity
+        # default name -> next suffix to try; all lower suffixes are known to be taken
+        next_suffixes: dict[str, int] = {}
         for i, (expr, name) in enumerate(select_list):
             if name is None:
                 # use default, add suffix if needed so default adds no duplicates
@@ -242,10 +280,11 @@ class Query:
                     column_name = default_name
                     if default_name in seen_out_names:
                         # already used, then add suffix until unique name is found
-                        for j in range(1, len(out_names) + 1):
-                            column_name = f'{default_name}_{j}'
-                            if column_name not in seen_out_names:
-                                break
+                        j = next_suffixes.get(default_name, 1)
+                        while f'{default_name}_{j}' in seen_out_names:
+                            j += 1
+                        column_name = f'{default_name}_{j}'
+                        next_suffixes[default_name] = j + 1
                 else:  # no default name, eg some expressions
                     column_name = f'col_{i}'
             else:  # user provided name, no attempt to rename
@@ -266,6 +305,8 @@ class Query:
         """
         Return a dict mapping variable name to Variable for all Variables contained in any component of the Query
         """
+        if self._vars_cache is not None:
+            return self._vars_cache
         all_exprs: list[exprs.Expr] = []
         all_exprs.extend(self._select_list_exprs)
         if self.where_clause is not None:
@@ -283,6 +324,8 @@ class Query:
                 unique_vars[var.name] = var
             elif unique_vars[var.name].col_type != var.col_type:
                 raise excs.Error(f'Multiple definitions of parameter {var.name!r}')
+        # the clauses don't change after construction
+        self._vars_cache = unique_vars
         return unique_vars
 
     @classmethod
@@ -322,20 +365,23 @@ class Query:
         """
         return {name: var.col_type for name, var in self._vars().items()}
 
-    def _exec(self) -> Iterator[exprs.DataRow]:
-        """Run the query and return rows as a generator.
+    def _exec_batches(self) -> Iterator[exec.DataRowBatch]:
+        """Run the query and return row batches as a generator.
         This function must not modify the state of the Query, otherwise it breaks dataset caching.
         """
         plan = self._create_query_plan()
+        with plan:
+            for row_batch in plan:
+                # stop progress output before we display anything, otherwise it'll mess up the output
+                Env.get().stop_progress()
+                yield row_batch
 
-        def exec_plan() -> Iterator[exprs.DataRow]:
-            with plan:
-                for row_batch in plan:
-                    # stop progress output before we display anything, otherwise it'll mess up the output
-                    Env.get().stop_progress()
-                    yield from row_batch
-
-        yield from exec_plan()
+    def _exec(self) -> Iterator[exprs.DataRow]:
+        """Run the query and return rows as a generator.
+        This function must not modify the state of the Query, otherwise it breaks dataset caching.
+        """
+        for row_batch in self._exec_batches():
+            yield from row_batch
 
     async def _aexec(self) -> AsyncIterator[exprs.DataRow]:
         """Run the query and return rows as a generator.
@@ -447,20 +493,28 @@ class Query:
         return self._schema
 
     def bind(self, args: dict[str, Any]) -> Query:
-        """Bind arguments to parameters and return a new Query."""
+        """Bind arguments to parameters and return the resulting Query."""
+        vars = self._vars()
+        if (
+            vars.keys().isdisjoint(args.keys())
+            and (self.limit_val is None or isinstance(self.limit_val, exprs.Literal))
+            and self.sample_clause is None
+        ):
+            # there is nothing to substitute, and Queries aren't modified after construction
+            return self
+
         # substitute Variables with the corresponding values according to 'args', converted to Literals
-        select_list_exprs = copy.deepcopy(self._select_list_exprs)
-        where_clause = copy.deepcopy(self.where_clause)
-        group_by_clause = copy.deepcopy(self.group_by_clause)
+        select_list_exprs = exprs.Expr.copy_list(self._select_list_exprs)
+        where_clause = self.where_clause.copy() if self.where_clause is not None else None
+        group_by_clause = exprs.Expr.copy_list(self.group_by_clause)
         order_by_exprs = (
-            [copy.deepcopy(order_by_expr) for order_by_expr, _ in self.order_by_clause]
+            [order_by_expr.copy() for order_by_expr, _ in self.order_by_clause]
             if self.order_by_clause is not None
             else None
         )
-        limit_val = copy.deepcopy(self.limit_val)
+        limit_val = self.limit_val.copy() if self.limit_val is not None else None
 
         var_exprs: dict[exprs.Expr, exprs.Expr] = {}
-        vars = self._vars()
         for arg_name, arg_val in args.items():
             if arg_name not in vars:
                 # ignore unused variables
@@ -522,8 +576,13 @@ class Query:
         single_tbl = self._first_tbl if len(self._from_clause.tbls) == 1 else None
         with Catalog.get().begin_xact(tbl=single_tbl, for_write=False):
             try:
-                for data_row in self._exec():
-                    yield [data_row[e.slot_idx] for e in self._select_list_exprs]
+                # slot idxs are assigned when the plan gets created, ie, before the first batch is returned
+                slot_idxs: list[int] | None = None
+                for row_batch in self._exec_batches():
+                    if slot_idxs is None:
+                        slot_idxs = [e.slot_idx for e in self._select_list_exprs]
+                    for data_row in row_batch:
+                        yield [data_row[slot_idx] for slot_idx in slot_idxs]
             except excs.ExprEvalError as e:
                 self._raise_expr_eval_err(e)
             except (sql_exc.DBAPIError, sql_exc.OperationalError, sql_exc.InternalError) as e:
@@ -1348,14 +1407,83 @@ class Query:
 
     def _hash_result_set(self) -> str:
         """Return a hash that changes when the result set changes."""
-        d = self.as_dict()
+        if self._summary_hash is None:
+            # the clauses don't change after construction, only the table versions do;
+            # we feed the encoded chunks straight into the hash, rather than materializing the serialized string
+            # sort keys so that the digest doesn't depend on dict construction order
+            encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+            # the hash is a cache key, not a security measure
+            summary_hash = hashlib.sha256(usedforsecurity=False)
+            for chunk in encoder.iterencode(self.as_dict()):
+                summary_hash.update(chunk.encode())
+            self._summary_hash = summary_hash
         # add list of referenced table versions (the actual versions, not the effective ones) in order to force cache
         # invalidation when any of the referenced tables changes
-        d['tbl_versions'] = [
+        tbl_versions = tuple(
             tbl_version.get().version for tbl in self._from_clause.tbls for tbl_version in tbl.get_tbl_versions()
-        ]
-        summary_string = json.dumps(d)
-        return hashlib.sha256(summary_string.encode()).hexdigest()
+        )
+        result_hash = self._summary_hash.copy()
+        result_hash.update(json.dumps(tbl_versions, separators=(',', ':')).encode())
+        return result_hash.hexdigest()
+
+    @classmethod
+    def _dataset_cache_path(cls, prefix: str, cache_key: str) -> Path:
+        """Return the location of a cached dataset.
+
+        Entries are spread over two levels of subdirectories, based on the leading digits of the key, in order to keep
+        the size of individual directories bounded.
+        """
+        # 64 bits of the digest are plenty to avoid collisions among cached datasets
+        key = cache_key[:16]
+        return Env.get().dataset_cache_dir / key[:2] / key[2:4] / f'{prefix}_{key}'
+
+    @classmethod
+    def _evict_cached_datasets(cls, keep: Path) -> None:
+        """Remove the least recently used cached datasets until the cache fits into dataset_cache_size_g.
+
+        The mtime of a cache entry records its last use. 'keep' is the entry that was just created; it is never removed,
+        nor are the entries of pytorch datasets that are still in use in this process.
+        """
+        max_size_g = Env.get().dataset_cache_size_g
+        if max_size_g is None:
+            return
+        capacity_bytes = int(max_size_g * (1 << 30))
+        in_use = {keep, *(ds.path for ds in _live_pytorch_datasets)}
+        cache_dir = Env.get().dataset_cache_dir
+        total_size = 0
+        entries: list[tuple[float, int, Path]] = []  # (mtime, size, path)
+        # entries in the current layout (see _dataset_cache_path()) and in the flat layout used previously;
+        # exports in progress are written to .tmp_<name> and don't match
+        for pattern in ('*/*/coco_*', '*/*/df_*', 'coco_*', 'df_*'):
+            for path in cache_dir.glob(pattern):
+                try:
+                    size = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    # the entry was removed concurrently, eg, by another process sharing the cache
+                    continue
+                total_size += size
+                if path not in in_use:
+                    entries.append((mtime, size, path))
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= capacity_bytes:
+                break
+            _logger.debug(f'Evicting cached dataset {path}')
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+    @classmethod
+    def _touch_cached_dataset(cls, path: Path) -> bool:
+        """Record the access to a cached dataset for cache eviction.
+
+        Returns False if the entry is gone, ie, it was evicted concurrently and needs to be regenerated.
+        """
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
 
     def to_coco_dataset(self) -> Path:
         """Convert the Query to a COCO dataset.
@@ -1379,18 +1507,16 @@ class Query:
         """
         from pixeltable.utils.coco import write_coco_dataset
 
-        cache_key = self._hash_result_set()
-        dest_path = Env.get().dataset_cache_dir / f'coco_{cache_key}'
-        if dest_path.exists():
-            assert dest_path.is_dir()
-            data_file_path = dest_path / 'data.json'
-            assert data_file_path.exists()
-            assert data_file_path.is_file()
+        dest_path = self._dataset_cache_path('coco', self._hash_result_set())
+        data_file_path = dest_path / 'data.json'
+        # a single stat(): if data.json is a regular file, dest_path is a directory
+        if data_file_path.is_file() and self._touch_cached_dataset(dest_path):
             return data_file_path
-        else:
-            # TODO: extend begin_xact() to accept multiple TVPs for joins
-            with Catalog.get().begin_xact(tbl=self._first_tbl, for_write=False):
-                return write_coco_dataset(self, dest_path)
+        # TODO: extend begin_xact() to accept multiple TVPs for joins
+        with Catalog.get().begin_xact(tbl=self._first_tbl, for_write=False):
+            data_file_path = write_coco_dataset(self, dest_path)
+        self._evict_cached_datasets(keep=dest_path)
+        return data_file_path
 
     def to_pytorch_dataset(self, image_format: str = 'pt') -> 'torch.utils.data.IterableDataset':
         """
@@ -1428,13 +1554,13 @@ class Query:
         from pixeltable.io import export_parquet
         from pixeltable.utils.pytorch import PixeltablePytorchDataset
 
-        cache_key = self._hash_result_set()
-
-        dest_path = (Env.get().dataset_cache_dir / f'df_{cache_key}').with_suffix('.parquet')
-        if dest_path.exists():  # fast path: use cache
-            assert dest_path.is_dir()
-        else:
+        dest_path = self._dataset_cache_path('df', self._hash_result_set()).with_suffix('.parquet')
+        # fast path: if the directory already exists, use the cached dataset
+        if not (dest_path.is_dir() and self._touch_cached_dataset(dest_path)):
             with Catalog.get().begin_xact(tbl=self._first_tbl, for_write=False):
                 export_parquet(self, dest_path, inline_images=True)
+            self._evict_cached_datasets(keep=dest_path)
 
-        return PixeltablePytorchDataset(path=dest_path, image_format=image_format)
+        dataset = PixeltablePytorchDataset(path=dest_path, image_format=image_format)
+        _live_pytorch_datasets.add(dataset)
+        return dataset
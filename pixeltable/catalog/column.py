@@ -342,6 +342,8 @@ class Column:
         return hash((self.tbl_handle.id, self.id))
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Column):
             return False
         assert self.tbl_handle is not None
@@ -415,7 +415,7 @@ class TableVersion:
             plan, _ = Planner.create_view_load_plan(view_path)
             with Env.get().report_progress():
                 plan.ctx.title = self.display_str()
-                _, row_counts = self.store_tbl.insert_rows(plan, v_min=self.version)
+                _, row_counts = self.store_tbl.insert_rows(plan, v_min=self.version, use_copy=True)
             status = UpdateStatus(row_count_stats=row_counts)
             Catalog.get().store_update_status(self.id, self.version, status)
             _logger.debug(f'Loaded view {self.name} with {row_counts.num_rows} rows')
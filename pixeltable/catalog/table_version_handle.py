@@ -72,11 +72,10 @@ class TableVersionHandle:
                 self._tbl_version = cat._tbl_versions[self.key]
                 self._tbl_version.is_validated = True
             else:
-                self._tbl_version = Catalog.get().get_tbl_version(self.key)
+                self._tbl_version = cat.get_tbl_version(self.key)
                 assert self._tbl_version.key == self.key
-        if self.effective_version is None:
-            tvs = list(Catalog.get()._tbl_versions.values())
-            assert self._tbl_version in tvs, self._tbl_version
+        # this is a linear scan of the TableVersion cache; keep it inside the assert so that it's skipped under -O
+        assert self.effective_version is not None or self._tbl_version in cat._tbl_versions.values(), self._tbl_version
         return self._tbl_version
 
     def as_dict(self) -> dict:
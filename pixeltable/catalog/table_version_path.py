@@ -61,10 +61,7 @@ class TableVersionPath:
         return result
 
     def as_md(self) -> schema.TableVersionPath:
-        result = [(self.tbl_version.id.hex, self.tbl_version.effective_version)]
-        if self.base is not None:
-            result.extend(self.base.as_md())
-        return result
+        return [(tv.id.hex, tv.effective_version) for tv in self.get_tbl_versions()]
 
     def refresh_cached_md(self) -> None:
         from pixeltable.catalog import Catalog
@@ -162,9 +159,12 @@ class TableVersionPath:
 
     def get_tbl_versions(self) -> list[TableVersionHandle]:
         """Return all tbl versions"""
-        if self.base is None:
-            return [self.tbl_version]
-        return [self.tbl_version, *self.base.get_tbl_versions()]
+        result: list[TableVersionHandle] = []
+        path: TableVersionPath | None = self
+        while path is not None:
+            result.append(path.tbl_version)
+            path = path.base
+        return result
 
     def get_bases(self) -> list[TableVersionHandle]:
         """Return all tbl versions"""
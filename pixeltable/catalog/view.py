@@ -27,6 +27,9 @@ if TYPE_CHECKING:
 
 _logger = logging.getLogger('pixeltable')
 
+# Python and Pixeltable signatures of ComponentIterator.__init__(); these depend only on the iterator class
+_iterator_signatures: dict[type[ComponentIterator], tuple[inspect.Signature, func.Signature]] = {}
+
 
 class View(Table):
     """A `Table` that presents a virtual view of another table (or view).
@@ -99,11 +102,8 @@ class View(Table):
         cls._verify_schema(columns)
 
         # verify that filters can be evaluated in the context of the base
-        if predicate is not None:
-            if not predicate.is_bound_by([base]):
-                raise excs.Error(f'View filter cannot be computed in the context of the base table {base.tbl_name()!r}')
-            # create a copy that we can modify and store
-            predicate = predicate.copy()
+        if predicate is not None and not predicate.is_bound_by([base]):
+            raise excs.Error(f'View filter cannot be computed in the context of the base table {base.tbl_name()!r}')
         if sample_clause is not None:
             # make sure that the sample clause can be computed in the context of the base
             if sample_clause.stratify_exprs is not None and not all(
@@ -129,11 +129,14 @@ class View(Table):
                     f'base table {base.tbl_name()!r}'
                 )
 
+        iterator_class_fqn: str | None = None
+        iterator_args_expr: exprs.Expr | None = None
         if iterator_cls is not None:
             assert iterator_args is not None
+            iterator_class_fqn = f'{iterator_cls.__module__}.{iterator_cls.__name__}'
 
             # validate iterator_args
-            py_signature = inspect.signature(iterator_cls.__init__)
+            py_signature, sig = cls._get_iterator_signature(iterator_cls)
 
             # make sure iterator_args can be used to instantiate iterator_cls
             bound_args: dict[str, Any]
@@ -145,15 +148,11 @@ class View(Table):
             first_param_name = next(iter(py_signature.parameters))  # can't guarantee it's actually 'self'
             del bound_args[first_param_name]
 
-            # construct Signature and type-check bound_args
-            params = [
-                func.Parameter(param_name, param_type, kind=inspect.Parameter.POSITIONAL_OR_KEYWORD)
-                for param_name, param_type in iterator_cls.input_schema().items()
-            ]
-            sig = func.Signature(ts.InvalidType(), params)
-
+            # type-check bound_args
             expr_args = {k: exprs.Expr.from_object(v) for k, v in bound_args.items()}
             sig.validate_args(expr_args, context=f'in iterator of type `{iterator_cls.__name__}`')
+            # only now that all args are known to be valid exprs can we assemble them into an InlineDict
+            iterator_args_expr = exprs.InlineDict(iterator_args)
             literal_args = {k: v.val if isinstance(v, exprs.Literal) else v for k, v in expr_args.items()}
 
             # prepend pos and output_schema columns to cols:
@@ -163,46 +162,49 @@ class View(Table):
             iterator_cols = [Column(_POS_COLUMN_NAME, ts.IntType(), is_iterator_col=True, stored=False)]
             output_dict, unstored_cols = iterator_cls.output_schema(**literal_args)
             iterator_cols.extend(
-                [
-                    Column(col_name, col_type, is_iterator_col=True, stored=col_name not in unstored_cols)
-                    for col_name, col_type in output_dict.items()
-                ]
+                Column(col_name, col_type, is_iterator_col=True, stored=col_name not in unstored_cols)
+                for col_name, col_type in output_dict.items()
             )
 
-            iterator_col_names = {col.name for col in iterator_cols}
-            for col in columns:
-                if col.name in iterator_col_names:
-                    raise excs.Error(
-                        f'Duplicate name: column {col.name!r} is already present in the iterator output schema'
-                    )
+            dup_names = {col.name for col in columns} & {col.name for col in iterator_cols}
+            if len(dup_names) > 0:
+                names_str = ', '.join(repr(name) for name in sorted(dup_names))
+                raise excs.Error(
+                    f'Duplicate name: column {names_str} is already present in the iterator output schema'
+                    if len(dup_names) == 1
+                    else f'Duplicate names: columns {names_str} are already present in the iterator output schema'
+                )
             columns = iterator_cols + columns
 
-        from pixeltable.exprs import InlineDict
-
-        iterator_args_expr: exprs.Expr = InlineDict(iterator_args) if iterator_args is not None else None
-        iterator_class_fqn = f'{iterator_cls.__module__}.{iterator_cls.__name__}' if iterator_cls is not None else None
         base_version_path = cls._get_snapshot_path(base) if is_snapshot else base
 
         # if this is a snapshot, we need to retarget all exprs to the snapshot tbl versions
         if is_snapshot:
-            predicate = predicate.retarget(base_version_path) if predicate is not None else None
+            # retarget() modifies the expr in place: do that on a copy, not on the caller's predicate
+            predicate = predicate.copy().retarget(base_version_path) if predicate is not None else None
             if sample_clause is not None:
                 exprs.Expr.retarget_list(sample_clause.stratify_exprs, base_version_path)
-            iterator_args_expr = (
-                iterator_args_expr.retarget(base_version_path) if iterator_args_expr is not None else None
-            )
-            for col in columns:
-                if col.value_expr is not None:
-                    col.set_value_expr(col.value_expr.retarget(base_version_path))
-
+            if iterator_args_expr is not None:
+                iterator_args_expr = iterator_args_expr.retarget(base_version_path)
+            # retarget all value exprs in one go, so that the TableVersions of the path only get resolved once
+            computed_cols = [col for col in columns if col.value_expr is not None]
+            value_exprs = [col.value_expr for col in computed_cols]
+            exprs.Expr.retarget_list(value_exprs, base_version_path)
+            for col, value_expr in zip(computed_cols, value_exprs):
+                col.set_value_expr(value_expr)
+
+        # serialize the final (possibly retargeted) exprs exactly once
+        predicate_dict = predicate.as_dict() if predicate is not None else None
+        sample_clause_dict = sample_clause.as_dict() if sample_clause is not None else None
+        iterator_args_dict = iterator_args_expr.as_dict() if iterator_args_expr is not None else None
         view_md = md_schema.ViewMd(
             is_snapshot=is_snapshot,
             include_base_columns=include_base_columns,
-            predicate=predicate.as_dict() if predicate is not None else None,
-            sample_clause=sample_clause.as_dict() if sample_clause is not None else None,
+            predicate=predicate_dict,
+            sample_clause=sample_clause_dict,
             base_versions=base_version_path.as_md(),
             iterator_class_fqn=iterator_class_fqn,
-            iterator_args=iterator_args_expr.as_dict() if iterator_args_expr is not None else None,
+            iterator_args=iterator_args_dict,
         )
 
         md = TableVersion.create_initial_md(
@@ -231,6 +233,18 @@ class View(Table):
             ]
             return md, ops
 
+    @classmethod
+    def _get_iterator_signature(cls, iterator_cls: type[ComponentIterator]) -> tuple[inspect.Signature, func.Signature]:
+        """Returns the Python signature of iterator_cls.__init__() and the Signature of its input schema"""
+        if iterator_cls not in _iterator_signatures:
+            py_signature = inspect.signature(iterator_cls.__init__)
+            params = [
+                func.Parameter(param_name, param_type, kind=inspect.Parameter.POSITIONAL_OR_KEYWORD)
+                for param_name, param_type in iterator_cls.input_schema().items()
+            ]
+            _iterator_signatures[iterator_cls] = (py_signature, func.Signature(ts.InvalidType(), params))
+        return _iterator_signatures[iterator_cls]
+
     @classmethod
     def _verify_column(cls, col: Column) -> None:
         # make sure that columns are nullable or have a default
@@ -313,8 +327,9 @@ class View(Table):
         base_tbl_id = self._base_tbl_id
         if base_tbl_id is None:
             return None
-        with catalog.Catalog.get().begin_xact(tbl_id=base_tbl_id, for_write=False):
-            return catalog.Catalog.get().get_table_by_id(base_tbl_id)
+        cat = catalog.Catalog.get()
+        with cat.begin_xact(tbl_id=base_tbl_id, for_write=False):
+            return cat.get_table_by_id(base_tbl_id)
 
     @property
     def _effective_base_versions(self) -> list[int | None]:
@@ -337,8 +352,9 @@ class View(Table):
             # bases_descrs can be empty in the case of a table-replica
             result.append(f' (of {", ".join(bases_descrs)})')
 
-        if self._tbl_version_path.tbl_version.get().predicate is not None:
-            result.append(f'\nWhere: {self._tbl_version_path.tbl_version.get().predicate!s}')
-        if self._tbl_version_path.tbl_version.get().sample_clause is not None:
-            result.append(f'\nSample: {self._tbl_version.get().sample_clause!s}')
+        tbl_version = self._tbl_version_path.tbl_version.get()
+        if tbl_version.predicate is not None:
+            result.append(f'\nWhere: {tbl_version.predicate!s}')
+        if tbl_version.sample_clause is not None:
+            result.append(f'\nSample: {tbl_version.sample_clause!s}')
         return ''.join(result)
@@ -157,6 +157,7 @@ KNOWN_CONFIG_OPTIONS = {
         'pgdata': 'Path to the Pixeltable postgres data directory',
         'db': 'Postgres database name',
         'file_cache_size_g': 'Size of the file cache in GB',
+        'dataset_cache_size_g': 'Maximum size of the dataset cache (pytorch and COCO exports) in GB',
         'time_zone': 'Default time zone for timestamps',
         'hide_warnings': 'Hide warnings from the console',
         'verbosity': 'Verbosity level for console output',
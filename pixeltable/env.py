@@ -92,6 +92,7 @@ class Env:
     _log_to_stdout: bool
     _module_log_level: dict[str, int]  # module name -> log level
     _file_cache_size_g: float
+    _dataset_cache_size_g: float | None  # if None, the dataset cache is unbounded
     _default_input_media_dest: str | None
     _default_output_media_dest: str | None
     _pxt_api_key: str | None
@@ -474,6 +475,7 @@ class Env:
                 f'(either add a `file_cache_size_g` entry to the `pixeltable` section of {Config.get().config_file},\n'
                 'or set the PIXELTABLE_FILE_CACHE_SIZE_G environment variable)'
             )
+        self._dataset_cache_size_g = config.get_float_value('dataset_cache_size_g')
 
         self._default_input_media_dest = config.get_string_value('input_media_dest')
         self._default_output_media_dest = config.get_string_value('output_media_dest')
@@ -972,6 +974,10 @@ class Env:
         assert self._dataset_cache_dir is not None
         return self._dataset_cache_dir
 
+    @property
+    def dataset_cache_size_g(self) -> float | None:
+        return self._dataset_cache_size_g
+
     @property
     def tmp_dir(self) -> Path:
         assert self._tmp_dir is not None
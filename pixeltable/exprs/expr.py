@@ -268,8 +268,9 @@ class Expr(abc.ABC):
         """Returns True if this expr can be evaluated in the context of tbls."""
         from .column_ref import ColumnRef
 
-        col_refs = self.subexprs(ColumnRef)
-        return all(any(tbl.has_column(col_ref.col) for tbl in tbls) for col_ref in col_refs)
+        # the same column is often referenced repeatedly; we only need to check each Column instance once
+        cols = {id(col_ref.col): col_ref.col for col_ref in self.subexprs(ColumnRef)}
+        return all(any(tbl.has_column(col) for tbl in tbls) for col in cols.values())
 
     def retarget(self, tbl: catalog.TableVersionPath) -> Self:
         """Retarget ColumnRefs in this expr to the specific TableVersions in tbl."""
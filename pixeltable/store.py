@@ -46,6 +46,9 @@ class StoreBase:
     # TODO: Perform more rigorous experiments with different table structures and OS environments to refine this.
     __INSERT_BATCH_SIZE = 10_000
 
+    # Below this number of rows, the setup cost of a COPY outweighs its per-row savings over a multi-row INSERT.
+    __COPY_THRESHOLD = 100
+
     def __init__(self, tbl_version: catalog.TableVersion):
         self.tbl_version = tbl_version.handle
         self.sa_md = sql.MetaData()
@@ -354,7 +357,6 @@ class StoreBase:
                 # insert rows from exec_plan into temp table
                 for row_batch in exec_plan:
                     num_rows += len(row_batch)
-                    batch_table_rows: list[tuple[Any]] = []
 
                     for row in row_batch:
                         if abort_on_exc and row.has_exc():
@@ -362,9 +364,7 @@ class StoreBase:
                             raise excs.Error(f'Error while evaluating computed column {col.name!r}:\n{exc}') from exc
                         table_row, num_row_exc = row_builder.create_store_table_row(row, None, row.pk)
                         num_excs += num_row_exc
-                        batch_table_rows.append(tuple(table_row))
-
-                    table_rows.extend(batch_table_rows)
+                        table_rows.append(tuple(table_row))
 
                     if len(table_rows) >= self.__INSERT_BATCH_SIZE:
                         self.sql_insert(tmp_tbl, tmp_col_names, table_rows)
@@ -398,9 +398,17 @@ class StoreBase:
         return num_excs
 
     def insert_rows(
-        self, exec_plan: ExecNode, v_min: int, rowids: Iterator[int] | None = None, abort_on_exc: bool = False
+        self,
+        exec_plan: ExecNode,
+        v_min: int,
+        rowids: Iterator[int] | None = None,
+        abort_on_exc: bool = False,
+        use_copy: bool = False,
     ) -> tuple[set[int], RowCountStats]:
         """Insert rows into the store table and update the catalog table's md
+        Args:
+            use_copy: if True, load batches via COPY FROM STDIN when possible (used for bulk loads such as the
+                initial population of a view)
         Returns:
             number of inserted rows, number of exceptions, set of column ids that have exceptions
         """
@@ -422,9 +430,9 @@ class StoreBase:
 
             for row_batch in exec_plan:
                 num_rows += len(row_batch)
-                batch_table_rows: list[tuple[Any]] = []
 
-                # compute batch of rows and convert them into table rows
+                # compute batch of rows and convert them into table rows; we append directly to table_rows, which
+                # gets flushed every __INSERT_BATCH_SIZE rows, so memory use doesn't depend on the size of the plan
                 for row in row_batch:
                     # if abort_on_exc == True, we need to check for media validation exceptions
                     if abort_on_exc and row.has_exc():
@@ -437,20 +445,18 @@ class StoreBase:
                     table_row, num_row_exc = row_builder.create_store_table_row(row, cols_with_excs, pk)
                     num_excs += num_row_exc
 
-                    batch_table_rows.append(tuple(table_row))
-
-                table_rows.extend(batch_table_rows)
+                    table_rows.append(tuple(table_row))
 
                 # if a batch is ready for insertion into the database, insert it
                 if len(table_rows) >= self.__INSERT_BATCH_SIZE:
-                    self.sql_insert(self.sa_tbl, store_col_names, table_rows)
+                    self._insert_batch(store_col_names, table_rows, use_copy)
                     if progress_reporter is not None:
                         progress_reporter.update(len(table_rows))
                     table_rows.clear()
 
             # insert any remaining rows
             if len(table_rows) > 0:
-                self.sql_insert(self.sa_tbl, store_col_names, table_rows)
+                self._insert_batch(store_col_names, table_rows, use_copy)
                 if progress_reporter is not None:
                     progress_reporter.update(len(table_rows))
 
@@ -458,20 +464,45 @@ class StoreBase:
 
             return cols_with_excs, row_counts
 
+    def _insert_batch(self, store_col_names: list[str], table_rows: list[tuple[Any]], use_copy: bool) -> None:
+        if use_copy and len(table_rows) >= self.__COPY_THRESHOLD and not Env.get().is_using_cockroachdb:
+            self.sql_copy(self.sa_tbl, store_col_names, table_rows)
+        else:
+            self.sql_insert(self.sa_tbl, store_col_names, table_rows)
+
+    @classmethod
+    def sql_copy(cls, sa_tbl: sql.Table, store_col_names: list[str], table_rows: list[tuple[Any]]) -> None:
+        """Load table_rows via COPY FROM STDIN on the connection of the current transaction.
+
+        COPY bypasses SQLAlchemy's parameter binding, so we apply the columns' bind processors ourselves in order
+        to get the same data representation (eg, for JSONB and vector columns) as sql_insert().
+        """
+        assert len(table_rows) > 0
+        conn = Env.get().conn
+        bind_processors = [
+            sa_tbl.columns[col_name].type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+            for col_name in store_col_names
+        ]
+        copy_stmt = f'COPY {sa_tbl.name} ({", ".join(store_col_names)}) FROM STDIN'
+        dbapi_conn = conn.connection.driver_connection
+        with dbapi_conn.cursor() as cursor, cursor.copy(copy_stmt) as copy:
+            for table_row in table_rows:
+                copy.write_row(
+                    [
+                        val if val is None or processor is None else processor(val)
+                        for val, processor in zip(table_row, bind_processors)
+                    ]
+                )
+
     @classmethod
     def sql_insert(cls, sa_tbl: sql.Table, store_col_names: list[str], table_rows: list[tuple[Any]]) -> None:
         assert len(table_rows) > 0
         conn = Env.get().conn
+        # This is a Core executemany, which psycopg runs in pipeline mode. We deliberately don't enable SQLAlchemy's
+        # insertmanyvalues for INSERTs without RETURNING: rendering multi-row VALUES statements was ~1.8x slower in
+        # a 100k-row benchmark.
         conn.execute(sql.insert(sa_tbl), [dict(zip(store_col_names, table_row)) for table_row in table_rows])
 
-        # TODO: Inserting directly via psycopg delivers a small performance benefit, but is somewhat fraught due to
-        #     differences in the data representation that SQLAlchemy/psycopg expect. The below code will do the
-        #     insertion in psycopg and can be used if/when we decide to pursue that optimization.
-        # col_names_str = ", ".join(store_col_names)
-        # placeholders_str = ", ".join('%s' for _ in store_col_names)
-        # stmt_text = f'INSERT INTO {self.sa_tbl.name} ({col_names_str}) VALUES ({placeholders_str})'
-        # conn.exec_driver_sql(stmt_text, table_rows)
-
     def _versions_clause(self, versions: list[int | None], match_on_vmin: bool) -> sql.ColumnElement[bool]:
         """Return filter for base versions"""
         v = versions[0]
@@ -1,4 +1,6 @@
 import json
+import os
+from concurrent import futures
 from pathlib import Path
 from typing import Any
 
@@ -6,6 +8,7 @@ import PIL
 
 import pixeltable as pxt
 import pixeltable.exceptions as excs
+from pixeltable.utils.transactional_directory import transactional_directory
 
 format_msg = """
 
@@ -22,6 +25,11 @@ Required format:
 }
 """
 
+# image encoding releases the GIL: we save images in a thread pool while the query keeps producing rows
+_MAX_SAVE_WORKERS = min(8, os.cpu_count() or 1)
+# limits the number of images that are kept in memory while waiting to be saved
+_MAX_PENDING_SAVES = 4 * _MAX_SAVE_WORKERS
+
 
 def _verify_input_dict(input_dict: dict[str, Any]) -> None:
     """Verify that input_dict is a valid input dict for write_coco_dataset()"""
@@ -57,81 +65,91 @@ def write_coco_dataset(query: pxt.Query, dest_path: Path) -> Path:
         raise excs.Error(f'Expected exactly one json-typed column in select list: {query._select_list_exprs}')
     input_dict_slot_idx = -1  # df._select_list_exprs[0].slot_idx isn't valid until _exec()
 
-    # create output dir
-    assert not dest_path.exists()
-    dest_path.mkdir(parents=False)
-    images_dir = dest_path / 'images'
-    images_dir.mkdir()
-
+    images_dir = dest_path / 'images'  # final location of the images, which is what data.json refers to
     images: list[dict[str, Any]] = []
     img_id = -1
     annotations: list[dict[str, Any]] = []
     ann_id = -1
     categories: set[Any] = set()
-    for input_row in query._exec():
-        if input_dict_slot_idx == -1:
-            input_dict_expr = query._select_list_exprs[0]
-            input_dict_slot_idx = input_dict_expr.slot_idx
-            input_dict = input_row[input_dict_slot_idx]
-            _verify_input_dict(input_dict)
-
-            # we want to know the slot idx of the image used in the input dict, so that we can check whether we
-            # already have a local path for it
-            input_dict_dependencies = input_dict_expr.dependencies()
-            img_slot_idx = next((e.slot_idx for e in input_dict_dependencies if e.col_type.is_image_type()), None)
-            assert img_slot_idx is not None
-        else:
-            input_dict = input_row[input_dict_slot_idx]
-            _verify_input_dict(input_dict)
-
-        # create image record
-        img_id += 1
-
-        # get a local path for the image
-        img = input_dict['image']
-        if input_row.file_paths[img_slot_idx] is not None:
-            # we already have a local path
-            img_path = Path(input_row.file_paths[img_slot_idx])
-            # TODO: if the path leads to our tmp dir, we need to move the file
-        else:
-            # we need to create a local path
-            img_path = images_dir / f'{img_id}.jpg'
-            img.save(img_path)
-
-        images.append({'id': img_id, 'file_name': str(img_path), 'width': img.width, 'height': img.height})
-
-        # create annotation records for this image
-        for annotation in input_dict['annotations']:
-            ann_id += 1
-            _, _, w, h = annotation['bbox']
-            category = annotation['category']
-            categories.add(category)
-            annotations.append(
-                {
-                    'id': ann_id,
-                    'image_id': img_id,
-                    # we use the category name here and fix it up at the end, when we have assigned category ids
-                    'category_id': category,
-                    'bbox': annotation['bbox'],
-                    'area': w * h,
-                    'iscrowd': 0,
-                }
-            )
-
-    # replace category names with ids
-    category_ids = {category: id for id, category in enumerate(sorted(categories))}
-    for annotation in annotations:
-        annotation['category_id'] = category_ids[annotation['category_id']]
-
-    result = {
-        'images': images,
-        'annotations': annotations,
-        'categories': [{'id': id, 'name': category} for category, id in category_ids.items()],
-    }
-    output_path = dest_path / 'data.json'
-    with open(output_path, 'w', encoding='utf-8') as fp:
-        json.dump(result, fp)
-    return output_path
+    # the dataset is assembled in a temporary directory that only gets moved to dest_path once it is complete, so
+    # that an interrupted export doesn't leave a partial dataset behind
+    with (
+        transactional_directory(dest_path) as tmp_path,
+        futures.ThreadPoolExecutor(max_workers=_MAX_SAVE_WORKERS) as executor,
+    ):
+        tmp_images_dir = tmp_path / 'images'
+        tmp_images_dir.mkdir()
+        pending_saves: set[futures.Future] = set()
+        for input_row in query._exec():
+            if input_dict_slot_idx == -1:
+                input_dict_expr = query._select_list_exprs[0]
+                input_dict_slot_idx = input_dict_expr.slot_idx
+                input_dict = input_row[input_dict_slot_idx]
+                _verify_input_dict(input_dict)
+
+                # we want to know the slot idx of the image used in the input dict, so that we can check whether we
+                # already have a local path for it
+                input_dict_dependencies = input_dict_expr.dependencies()
+                img_slot_idx = next((e.slot_idx for e in input_dict_dependencies if e.col_type.is_image_type()), None)
+                assert img_slot_idx is not None
+            else:
+                input_dict = input_row[input_dict_slot_idx]
+                _verify_input_dict(input_dict)
+
+            # create image record
+            img_id += 1
+
+            # get a local path for the image
+            img = input_dict['image']
+            if input_row.file_paths[img_slot_idx] is not None:
+                # we already have a local path
+                img_path = Path(input_row.file_paths[img_slot_idx])
+                # TODO: if the path leads to our tmp dir, we need to move the file
+            else:
+                # we need to create a local path
+                img_path = images_dir / f'{img_id}.jpg'
+                if len(pending_saves) >= _MAX_PENDING_SAVES:
+                    done, pending_saves = futures.wait(pending_saves, return_when=futures.FIRST_COMPLETED)
+                    for f in done:
+                        f.result()  # re-raise exceptions
+                pending_saves.add(executor.submit(img.save, tmp_images_dir / img_path.name))
+
+            images.append({'id': img_id, 'file_name': str(img_path), 'width': img.width, 'height': img.height})
+
+            # create annotation records for this image
+            for annotation in input_dict['annotations']:
+                ann_id += 1
+                _, _, w, h = annotation['bbox']
+                category = annotation['category']
+                categories.add(category)
+                annotations.append(
+                    {
+                        'id': ann_id,
+                        'image_id': img_id,
+                        # we use the category name here and fix it up at the end, when we have assigned category ids
+                        'category_id': category,
+                        'bbox': annotation['bbox'],
+                        'area': w * h,
+                        'iscrowd': 0,
+                    }
+                )
+
+        for f in futures.as_completed(pending_saves):
+            f.result()
+
+        # replace category names with ids
+        category_ids = {category: id for id, category in enumerate(sorted(categories))}
+        for annotation in annotations:
+            annotation['category_id'] = category_ids[annotation['category_id']]
+
+        result = {
+            'images': images,
+            'annotations': annotations,
+            'categories': [{'id': id, 'name': category} for category, id in category_ids.items()],
+        }
+        with open(tmp_path / 'data.json', 'w', encoding='utf-8') as fp:
+            json.dump(result, fp)
+    return dest_path / 'data.json'
 
 
 COCO_2017_CATEGORIES = {
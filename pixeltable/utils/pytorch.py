@@ -85,7 +85,8 @@ class PixeltablePytorchDataset(torch.utils.data.IterableDataset):
             part_list = [i for i in part_list if (i % worker_info.num_workers) == worker_info.id]
 
         for part_no in part_list:
-            pqf = parquet.ParquetFile(self.part_metadata[part_no])
+            # memory-map the file: pages are read through the OS page cache and shared across epochs and workers
+            pqf = parquet.ParquetFile(self.part_metadata[part_no], memory_map=True)
             for batch in pqf.iter_batches():
                 for tup in arrow.iter_tuples(batch):
                     yield {k: self._unmarshall(k, v) for k, v in tup.items()}
@@ -75,6 +75,21 @@ class TestComponentView:
             _ = pxt.create_view('test_view', video_t, iterator=frame_iterator(1, fps=1))
         assert 'argument type Int does not match parameter type Video' in str(excinfo.value)
 
+        # argument that can't be converted into an expression
+        with pytest.raises(pxt.Error) as excinfo:
+            _ = pxt.create_view('test_view', video_t, iterator=frame_iterator(video_t.video, fps=object()))
+        assert "Parameter 'fps' (in iterator of type `FrameIterator`): invalid argument" in str(excinfo.value)
+
+        # additional columns that collide with the iterator output schema
+        with pytest.raises(pxt.Error) as excinfo:
+            _ = pxt.create_view(
+                'test_view',
+                video_t,
+                additional_columns={'frame_idx': pxt.Int, 'pos_msec': pxt.Float},
+                iterator=frame_iterator(video_t.video, fps=1),
+            )
+        assert "columns 'frame_idx', 'pos_msec' are already present in the iterator output schema" in str(excinfo.value)
+
         # create frame view
         view_t = pxt.create_view('test_view', video_t, iterator=frame_iterator(video_t.video, fps=1))
         # computed column that references a column from the base
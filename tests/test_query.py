@@ -1,5 +1,8 @@
 import datetime
+import gc
+import os
 import re
+import shutil
 import urllib.request
 from pathlib import Path
 from typing import Any
@@ -12,12 +15,14 @@ import pytest
 
 import pixeltable as pxt
 import pixeltable.type_system as ts
+from pixeltable.env import Env
 from pixeltable.functions.video import frame_iterator
 
 from .utils import (
     ReloadTester,
     get_audio_files,
     get_documents,
+    get_image_files,
     get_video_files,
     reload_catalog,
     skip_test_if_not_installed,
@@ -753,6 +758,67 @@ class TestQuery:
             _ = view_t.select(view_t.detections).to_coco_dataset()
         assert 'missing key "image"' in str(exc_info.value).lower()
 
+    def test_dataset_cache_eviction(self, reset_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+        env = Env.get()
+        shutil.rmtree(env.dataset_cache_dir)
+        env.dataset_cache_dir.mkdir()
+        t = pxt.create_table('test_tbl', {'img': pxt.Image})
+        t.insert({'img': f} for f in get_image_files()[:5])
+
+        def coco_query(category: str) -> pxt.Query:
+            # the images are computed, which forces them to be written into the cached dataset
+            return t.select({'image': t.img.rotate(90), 'annotations': [{'bbox': [0, 0, 1, 1], 'category': category}]})
+
+        def entry_size(data_file: Path) -> int:
+            return sum(f.stat().st_size for f in data_file.parent.rglob('*') if f.is_file())
+
+        # an entry in the flat layout used by earlier versions, which hasn't been used in a long time
+        old_entry = env.dataset_cache_dir / f'coco_{"0" * 64}'
+        (old_entry / 'images').mkdir(parents=True)
+        shutil.copy(get_image_files()[0], old_entry / 'images' / '0.jpg')
+        os.utime(old_entry, (0, 0))
+
+        assert env.dataset_cache_size_g is None
+        path1 = coco_query('a').to_coco_dataset()
+        path2 = coco_query('b').to_coco_dataset()
+        # the cache is unbounded
+        assert path1.exists() and path2.exists()
+        # path1 is now the most recently used entry
+        assert coco_query('a').to_coco_dataset() == path1
+
+        # room for exactly two entries: creating a third one evicts the least recently used one
+        monkeypatch.setattr(env, '_dataset_cache_size_g', 2 * entry_size(path1) / (1 << 30))
+        path3 = coco_query('c').to_coco_dataset()
+        assert not old_entry.exists()
+        assert path1.exists()
+        assert not path2.parent.exists()
+        assert path3.exists()
+
+        # the new entry is never evicted, even if it exceeds the capacity by itself
+        monkeypatch.setattr(env, '_dataset_cache_size_g', 1 / (1 << 30))
+        path4 = coco_query('d').to_coco_dataset()
+        assert path4.exists()
+        assert not path1.parent.exists() and not path3.parent.exists()
+
+    def test_dataset_cache_eviction_live_datasets(self, reset_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+        skip_test_if_not_installed('torch', 'torchvision', 'pyarrow')
+        t = pxt.create_table('test_tbl', {'c1': pxt.Int})
+        t.insert({'c1': i} for i in range(10))
+
+        ds1 = t.select(t.c1).to_pytorch_dataset()
+        path1 = ds1.path
+        # any new entry exceeds the capacity and evicts all others, unless they're in use
+        monkeypatch.setattr(Env.get(), '_dataset_cache_size_g', 1 / (1 << 30))
+        ds2 = t.select(t.c1, c2=t.c1 + 1).to_pytorch_dataset()
+        assert path1.exists() and ds2.path.exists()
+
+        # once ds1 is gone, its entry can be evicted
+        del ds1
+        gc.collect()
+        ds3 = t.select(t.c1, c2=t.c1 + 2).to_pytorch_dataset()
+        assert not path1.exists()
+        assert ds2.path.exists() and ds3.path.exists()
+
     def test_distinct(self, reset_db: None, reload_tester: ReloadTester) -> None:
         schema = {'c1': pxt.String, 'c2': pxt.Int, 'c3': pxt.Float, 'c4': pxt.Timestamp, 'c5': pxt.Json}
         t = pxt.create_table('test_distinct', schema)
@@ -1,19 +1,23 @@
 import datetime
 import logging
 import re
+from typing import Any, Callable
 
+import numpy as np
 import PIL
 import pytest
 
 import pixeltable as pxt
 from pixeltable.catalog import Catalog
 from pixeltable.func import Batch
+from pixeltable.store import StoreBase
 
 from .utils import (
     ReloadTester,
     assert_resultset_eq,
     assert_table_metadata_eq,
     create_test_tbl,
+    get_image_files,
     reload_catalog,
     validate_update_status,
 )
@@ -31,6 +35,23 @@ def add_unstored_base_val(vals: Batch[int]) -> Batch[int]:
     return results
 
 
+@pxt.udf
+def to_array(val: int) -> pxt.Array[(3,), pxt.Float]:  # type: ignore[misc]
+    return np.array([val, val / 2, -val], dtype=np.float32)
+
+
+@pxt.udf
+def to_binary(val: int) -> bytes:
+    return val.to_bytes(4, 'little') + b'\x00\\\n\t'
+
+
+@pxt.udf
+def fail_on_multiple_of_3(val: int) -> int:
+    if val % 3 == 0:
+        raise ValueError(f'multiple of 3: {val}')
+    return val
+
+
 class TestView:
     """
     TODO:
@@ -90,13 +111,8 @@ class TestView:
             assert v.get_metadata()['base'] == t.get_metadata()['path']
             assert v.count() == t.where(t.c2 < 10).count()
             assert_resultset_eq(
-                v.select(v.v1).order_by(v.c2).collect(), t.select(t.c3 * 2.0).where(t.c2 < 10).order_by(t.c2).collect()
-            )
-            assert_resultset_eq(
-                v.select(v.v3).order_by(v.c2).collect(), t.select(t.c3 * 4.0).where(t.c2 < 10).order_by(t.c2).collect()
-            )
-            assert_resultset_eq(
-                v.select(v.v4).order_by(v.c2).collect(), t.select(t.c6.f5[0]).where(t.c2 < 10).order_by(t.c2).collect()
+                v.select(v.v1, v.v3, v.v4).order_by(v.c2).collect(),
+                t.select(t.c3 * 2.0, t.c3 * 4.0, t.c6.f5[0]).where(t.c2 < 10).order_by(t.c2).collect(),
             )
 
         check_view(t, v)
@@ -107,9 +123,6 @@ class TestView:
         v = pxt.get_table('test_view')
         check_view(t, v)
 
-        _ = v.select(v.v1).order_by(v.c2)
-        _ = t.select(t.c3 * 2.0).where(t.c2 < 10).order_by(t.c2)
-
         # insert data: of 20 new rows, only 10 are reflected in the view
         rows = list(t.select(t.c1, t.c1n, t.c2, t.c3, t.c4, t.c5, t.c6, t.c7, t.c10).where(t.c2 < 20).collect())
         status = t.insert(rows)
@@ -247,84 +260,74 @@ class TestView:
         """Test if_exists parameter of the add column methods for views"""
         non_existing_col1 = 'non_existing1_' + col_name
         non_existing_col2 = 'non_existing2_' + col_name
-        non_existing_col3 = 'non_existing3_' + col_name
-        non_existing_col4 = 'non_existing4_' + col_name
-        non_existing_col5 = 'non_existing5_' + col_name
+
+        def first_val(name: str) -> Any:
+            """Returns the value of column `name` in the first row of v, without reading the other columns"""
+            return v.select(getattr(v, name)).order_by(v.c1).limit(1).collect()[0, name]
+
+        def add_col_calls(col_type: type, other_col_name: str) -> list[Callable[..., Any]]:
+            """Calls that add col_name via each of the add column methods; add_columns() also adds other_col_name"""
+            return [
+                lambda **kwargs: v.add_column(**{col_name: col_type}, **kwargs),
+                lambda **kwargs: v.add_computed_column(**{col_name: t.c2 + t.c3}, **kwargs),
+                lambda **kwargs: v.add_columns({col_name: col_type, other_col_name: pxt.String}, **kwargs),
+            ]
 
         # invalid if_exists value is rejected
         expected_err = "if_exists must be one of: ['error', 'ignore', 'replace', 'replace_force']"
-        with pytest.raises(pxt.Error, match=re.escape(expected_err)):
-            v.add_column(**{col_name: pxt.Int}, if_exists='invalid')
-        with pytest.raises(pxt.Error, match=re.escape(expected_err)):
-            v.add_computed_column(**{col_name: t.c2 + t.c3}, if_exists='invalid')
-        with pytest.raises(pxt.Error, match=re.escape(expected_err)):
-            v.add_columns({col_name: pxt.Int, non_existing_col1: pxt.String}, if_exists='invalid')  # type: ignore[arg-type]
+        for add_col in add_col_calls(pxt.Int, non_existing_col1):
+            with pytest.raises(pxt.Error, match=re.escape(expected_err)):
+                add_col(if_exists='invalid')
         assert col_name in v.columns()
-        assert v.order_by(v.c1).collect()[0][col_name] == orig_val
+        assert first_val(col_name) == orig_val
 
         # by default, raises an error if the column already exists
         expected_err = f'Duplicate column name: {col_name}'
-        with pytest.raises(pxt.Error, match=expected_err):
-            v.add_column(**{col_name: pxt.Int})
-        with pytest.raises(pxt.Error, match=expected_err):
-            v.add_computed_column(**{col_name: t.c2 + t.c3})
-        with pytest.raises(pxt.Error, match=expected_err):
-            v.add_columns({col_name: pxt.Int, non_existing_col2: pxt.String})
+        for add_col in add_col_calls(pxt.Int, non_existing_col2):
+            with pytest.raises(pxt.Error, match=expected_err):
+                add_col()
         assert col_name in v.columns()
-        assert v.order_by(v.c1).collect()[0][col_name] == orig_val
+        assert first_val(col_name) == orig_val
         assert non_existing_col2 not in v.columns()
 
         # if_exists='ignore' will not add the column if it already exists
-        v.add_column(**{col_name: pxt.Int}, if_exists='ignore')
+        for add_col in add_col_calls(pxt.Int, non_existing_col2):
+            add_col(if_exists='ignore')
         assert col_name in v.columns()
-        assert v.order_by(v.c1).collect()[0][col_name] == orig_val
-        v.add_computed_column(**{col_name: t.c2 + t.c3}, if_exists='ignore')
-        assert col_name in v.columns()
-        assert v.order_by(v.c1).collect()[0][col_name] == orig_val
-        v.add_columns({col_name: pxt.Int, non_existing_col2: pxt.String}, if_exists='ignore')
-        assert col_name in v.columns()
-        assert v.order_by(v.c1).collect()[0][col_name] == orig_val
+        assert first_val(col_name) == orig_val
         assert non_existing_col2 in v.columns()
 
         # if_exists='replace' will replace the column if it already exists.
         # for a column specific to view. For a base table column, it will raise an error.
         if is_base_column:
-            with pytest.raises(pxt.Error) as exc_info:
-                v.add_column(**{col_name: pxt.String}, if_exists='replace')
-            error_msg = str(exc_info.value).lower()
-            assert 'is a base table column' in error_msg and 'cannot replace' in error_msg
-            assert col_name in v.columns()
-            assert v.order_by(v.c1).collect()[0][col_name] == orig_val
-            with pytest.raises(pxt.Error) as exc_info:
-                v.add_computed_column(**{col_name: t.c2 + t.c3}, if_exists='replace')
-            error_msg = str(exc_info.value).lower()
-            assert 'is a base table column' in error_msg and 'cannot replace' in error_msg
-            assert col_name in v.columns()
-            assert v.order_by(v.c1).collect()[0][col_name] == orig_val
-            with pytest.raises(pxt.Error) as exc_info:
-                v.add_columns({col_name: pxt.String, non_existing_col3: pxt.String}, if_exists='replace')
-            error_msg = str(exc_info.value).lower()
-            assert 'is a base table column' in error_msg and 'cannot replace' in error_msg
+            non_existing_col3 = 'non_existing3_' + col_name
+            for add_col in add_col_calls(pxt.String, non_existing_col3):
+                with pytest.raises(pxt.Error) as exc_info:
+                    add_col(if_exists='replace')
+                error_msg = str(exc_info.value).lower()
+                assert 'is a base table column' in error_msg and 'cannot replace' in error_msg
             assert col_name in v.columns()
-            assert v.order_by(v.c1).collect()[0][col_name] == orig_val
+            assert first_val(col_name) == orig_val
             assert non_existing_col3 not in v.columns()
         else:
+            non_existing_col4 = 'non_existing4_' + col_name
+            non_existing_col5 = 'non_existing5_' + col_name
             v.add_columns({col_name: pxt.Int, non_existing_col4: pxt.String}, if_exists='replace')
             assert col_name in v.columns()
-            assert v.order_by(v.c1).collect()[0][col_name] is None
+            assert first_val(col_name) is None
             assert non_existing_col4 in v.columns()
             v.add_computed_column(**{col_name: 'aaa'}, if_exists='replace')
             assert col_name in v.columns()
-            assert v.order_by(v.c1).collect()[0][col_name] == 'aaa'
+            assert first_val(col_name) == 'aaa'
             v.add_computed_column(**{col_name: t.c2 + t.c3}, if_exists='replace')
             assert col_name in v.columns()
-            row0 = v.order_by(v.c1).collect()[0]
+            row0 = v.select(getattr(v, col_name), v.c2, v.c3).order_by(v.c1).limit(1).collect()[0]
             assert row0[col_name] == row0['c2'] + row0['c3']
 
             # if_exists='replace' will raise an error and not replace if the column has a dependency.
             col_ref = getattr(v, col_name)
             v.add_computed_column(**{non_existing_col5: col_ref + 12.3})
-            assert v.order_by(v.c1).collect()[0][non_existing_col5] == row0[col_name] + 12.3
+            assert first_val(non_existing_col5) == row0[col_name] + 12.3
             expected_err = f'Column {col_name!r} already exists and has dependents.'
             with pytest.raises(pxt.Error, match=expected_err):
                 v.add_computed_column(**{col_name: 'bbb'}, if_exists='replace')
@@ -411,21 +414,13 @@ class TestView:
                 t.select(t.c3 * 2).where(t.c2 < 10).order_by(t.c2).collect(),
             )
             assert_resultset_eq(
-                v2.select(v2.col1).order_by(v2.c2).collect(),
-                v1.select(v1.col1).where(v1.c2 < 5).order_by(v1.c2).collect(),
+                v2.select(v2.col1, v2.col3, v2.col4).order_by(v2.c2).collect(),
+                v1.select(v1.col1, v1.col1 / 2, v1.c10 + v1.col1).where(v1.c2 < 5).order_by(v1.c2).collect(),
             )
             assert_resultset_eq(
                 v2.select(v2.col2).order_by(v2.c2).collect(),
                 t.select(t.c3 * 3).where(t.c2 < 5).order_by(t.c2).collect(),
             )
-            assert_resultset_eq(
-                v2.select(v2.col3).order_by(v2.c2).collect(),
-                v1.select(v1.col1 / 2).where(v1.c2 < 5).order_by(v2.c2).collect(),
-            )
-            assert_resultset_eq(
-                v2.select(v2.col4).order_by(v2.c2).collect(),
-                v1.select(v1.c10 + v1.col1).where(v1.c2 < 5).order_by(v1.c2).collect(),
-            )
             # t.select(t.c10 * 2).where(t.c2 < 5).order_by(t.c2).collect())
 
         check_views()
@@ -564,11 +559,13 @@ class TestView:
         # create table with image column and two updateable int columns
         schema = {'img': pxt.Image, 'int1': pxt.Int, 'int2': pxt.Int}
         t = pxt.create_table('test_tbl', schema)
-        # populate table with images of a defined size
-        width, height = 100, 100
+        # populate table with images of a defined size; the views crop at offsets derived from int1 (which goes up to
+        # num_rows after the update below), so the images need to be at least that large
+        num_rows = 32
+        width, height = 32, 32
         rows = [
             {'img': PIL.Image.new('RGB', (width, height), color=(0, 0, 0)).tobytes('jpeg', 'RGB'), 'int1': i, 'int2': i}
-            for i in range(100)
+            for i in range(num_rows)
         ]
         t.insert(rows)
 
@@ -581,12 +578,11 @@ class TestView:
         logger.debug('******************* CREATE V1')
         v1 = pxt.create_view('v1', t, additional_columns=v1_schema)
         v1.update({'int4': 1})
-        _ = v1.select(v1.img2.width, v1.img2.height).collect()
 
         # view with stored column that depends on t and view1
         v2_schema = {
             'img3': {
-                # use the actual width and height of the image (not 100, which will pad the image)
+                # use the actual width and height of the image (not `width`/`height`, which would pad the image)
                 'value': v1.img2.crop([t.int1 + t.int2, v1.int3 + v1.int4, v1.img2.width, v1.img2.height]),
                 'stored': True,
             }
@@ -718,6 +714,58 @@ class TestView:
         assert t.count() == 190
         assert_resultset_eq(v.select(v.v1).order_by(v.c2).collect(), t.select(t.c3 * 2.0).order_by(t.c2).collect())
 
+    def test_load_via_copy(self, reset_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The initial population of a view via COPY stores the same values as the population via INSERT"""
+        t = pxt.create_table('test_tbl', {'c1': pxt.Int, 'img': pxt.Image})
+        img_files = get_image_files()[:5]
+        num_rows = 150  # above the COPY threshold
+        t.insert({'c1': i, 'img': img_files[i % 5] if i % 7 != 0 else None} for i in range(num_rows))
+        schema = {
+            'json_col': {'value': {'a': t.c1, 'b': [t.c1, 'x\ty\\z', None], 'c': t.c1 % 2 == 0}},
+            'array_col': to_array(t.c1),
+            'binary_col': to_binary(t.c1),
+            'img_col': t.img.rotate(90),
+            'exc_col': fail_on_multiple_of_3(t.c1),
+        }
+
+        num_copies = 0
+        sql_copy = StoreBase.sql_copy
+
+        def count_copies(*args: Any) -> None:
+            nonlocal num_copies
+            num_copies += 1
+            sql_copy(*args)
+
+        monkeypatch.setattr(StoreBase, 'sql_copy', staticmethod(count_copies))
+        v1 = pxt.create_view('copy_view', t, additional_columns=schema)
+        assert num_copies == 1
+        # force the INSERT path
+        monkeypatch.setattr(StoreBase, '_StoreBase__COPY_THRESHOLD', num_rows + 1)
+        v2 = pxt.create_view('insert_view', t, additional_columns=schema)
+        assert num_copies == 1
+
+        def view_contents(v: pxt.Table) -> pxt.ResultSet:
+            return (
+                v.select(
+                    v.c1,
+                    v.json_col,
+                    v.array_col,
+                    v.binary_col,
+                    v.img_col,
+                    v.exc_col,
+                    v.exc_col.errortype,
+                    v.exc_col.errormsg,
+                )
+                .order_by(v.c1)
+                .collect()
+            )
+
+        res1 = view_contents(v1)
+        assert len(res1) == num_rows
+        assert res1['exc_col'].count(None) == num_rows // 3
+        assert res1['img_col'].count(None) == (num_rows + 6) // 7
+        assert_resultset_eq(res1, view_contents(v2))
+
     @pytest.mark.parametrize('do_reload_catalog', [False, True])
     def test_filter(self, do_reload_catalog: bool, reset_db: None) -> None:
         t = create_test_tbl()
@@ -761,13 +809,9 @@ class TestView:
         v = pxt.create_view('test_view', snap.where(snap.c2 < 10), additional_columns=schema)
 
         def check_view(s: pxt.Table, v: pxt.Table) -> None:
-            assert v.count() == s.where(s.c2 < 10).count()
-            assert_resultset_eq(
-                v.select(v.v1).order_by(v.c2).collect(), s.select(s.c3 * 2.0).where(s.c2 < 10).order_by(s.c2).collect()
-            )
-            assert_resultset_eq(
-                v.select(v.v2).order_by(v.c2).collect(), s.select(s.c6.f5).where(s.c2 < 10).order_by(s.c2).collect()
-            )
+            v_res = v.select(v.v1, v.v2).order_by(v.c2).collect()
+            assert len(v_res) == s.where(s.c2 < 10).count()
+            assert_resultset_eq(v_res, s.select(s.c3 * 2.0, s.c6.f5).where(s.c2 < 10).order_by(s.c2).collect())
 
         check_view(snap, v)
         # computed columns that don't reference the base table
@@ -821,15 +865,13 @@ class TestView:
         view_s = pxt.create_snapshot('test_view_snap', v)
         with Catalog.get().begin_xact(for_write=False):
             _ = Catalog.get().load_replica_md(view_s)
-        assert set(view_s._get_schema().keys()) == set(orig_view_cols)
+        assert view_s._get_schema().keys() == orig_view_cols
 
         def check(s1: pxt.Table, v: pxt.Table, s2: pxt.Table) -> None:
-            assert s1.where(s1.c2 < 10).count() == v.count()
-            assert v.count() == s2.count()
-            assert_resultset_eq(
-                s1.select(s1.c3 * 2.0, s1.c6.f5).where(s1.c2 < 10).order_by(s1.c2).collect(),
-                v.select(v.v1, v.v2).order_by(v.c2).collect(),
-            )
+            v_res = v.select(v.v1, v.v2).order_by(v.c2).collect()
+            assert s1.where(s1.c2 < 10).count() == len(v_res)
+            assert_resultset_eq(s1.select(s1.c3 * 2.0, s1.c6.f5).where(s1.c2 < 10).order_by(s1.c2).collect(), v_res)
+            # assert_resultset_eq() also checks that v and s2 have the same number of rows
             assert_resultset_eq(
                 v.select(v.c3, v.c6, v.v1, v.v2).order_by(v.c2).collect(),
                 s2.select(s2.c3, s2.c6, s2.v1, s2.v2).order_by(s2.c2).collect(),
@@ -841,14 +883,14 @@ class TestView:
         v.add_computed_column(v3=v.v1 * 2.0)
         v.add_computed_column(v4=v.v2[0])
         check(s, v, view_s)
-        assert set(view_s._get_schema().keys()) == set(orig_view_cols)
+        assert view_s._get_schema().keys() == orig_view_cols
 
         # check md after reload
         reload_catalog(do_reload_catalog)
         t = pxt.get_table('test_tbl')
         view_s = pxt.get_table('test_view_snap')
         check(s, v, view_s)
-        assert set(view_s._get_schema().keys()) == set(orig_view_cols)
+        assert view_s._get_schema().keys() == orig_view_cols
 
         # insert data: no changes to snapshot
         rows = list(t.select(t.c1, t.c1n, t.c2, t.c3, t.c4, t.c5, t.c6, t.c7, t.c10).where(t.c2 < 20).collect())
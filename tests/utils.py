@@ -468,6 +468,11 @@ def __find_column_mismatches(col_type: ts.ColumnType, s1: list[Any], s2: list[An
     Find the first `limit` mismatches between two lists of values.
     """
     comparer = __COMPARERS.get(col_type._type, __equality_comparer)
+    if comparer is __equality_comparer and s1 == s2:
+        # common case: compare the lists in one go and only look for individual mismatches if they differ
+        return []
+    if comparer is __float_comparer:
+        return __find_float_mismatches(s1, s2)
     mismatches = []
     for i, (v1, v2) in enumerate(zip(s1, s2)):
         if (v1 is None) != (v2 is None) or (v1 is not None and not comparer(v1, v2)):
@@ -475,6 +480,20 @@ def __find_column_mismatches(col_type: ts.ColumnType, s1: list[Any], s2: list[An
     return mismatches
 
 
+def __find_float_mismatches(s1: list[float | None], s2: list[float | None]) -> list[int]:
+    """
+    Vectorized version of the element-wise comparison with __float_comparer(), with the same handling of None.
+    """
+    n = min(len(s1), len(s2))
+    s1, s2 = s1[:n], s2[:n]
+    is_null1 = np.array([v is None for v in s1], dtype=bool)
+    is_null2 = np.array([v is None for v in s2], dtype=bool)
+    a1 = np.array([np.nan if v is None else v for v in s1], dtype=np.float64)
+    a2 = np.array([np.nan if v is None else v for v in s2], dtype=np.float64)
+    is_mismatch = (is_null1 != is_null2) | (~is_null1 & ~np.isclose(a1, a2, equal_nan=True))
+    return np.flatnonzero(is_mismatch).tolist()
+
+
 def __float_comparer(x: float, y: float) -> bool:
     return bool(np.isclose(x, y, equal_nan=True))
 